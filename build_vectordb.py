@@ -3,22 +3,147 @@ Build Vector Store from existing output
 No Claude API call needed - uses the already processed data.
 """
 
-import json
-import os
+import hashlib
+import re
+import sqlite3
 import sys
+from pathlib import Path
 
 import chromadb
+import ijson
+import numpy as np
+from chromadb.utils import embedding_functions
+
+from src.jcal import extract_props
+
+# Documents per collection.add() call - large enough to amortize the SQLite
+# transaction overhead, small enough to avoid one giant in-flight batch
+BATCH_SIZE = 166
+
+# Journal lines we care about: "## From: <source>" headers and "- <note>" bullets
+JOURNAL_LINE_PATTERN = re.compile(r"^(?:## From:(?P<src>.*)|- (?P<note>.*))$", re.M)
+
+
+def _quantize(vector: np.ndarray) -> tuple[float, np.ndarray]:
+    """Symmetric int8 quantization: returns (scale, int8 values)."""
+    max_abs = float(np.abs(vector).max())
+    scale = max_abs / 127 if max_abs else 1.0
+    return scale, np.round(vector / scale).astype(np.int8)
+
+
+def _dequantize(scale: float, quantized: np.ndarray) -> np.ndarray:
+    return quantized.astype(np.float32) * np.float32(scale)
+
+
+class _EmbeddingCache:
+    """
+    On-disk cache of note text -> embedding, keyed by sha256 of the text.
+
+    Only cache misses are sent to the embedding model, so rebuilding an
+    unchanged (or mostly unchanged) journal skips nearly all embedding work.
+
+    Vectors are stored int8-quantized with one float scale per vector (4x
+    smaller than float32). Fresh embeddings go through the same round trip,
+    so a document gets the same vector whether it was cached or not.
+    """
+
+    def __init__(self, cache_path: str, embedding_function):
+        self.embedding_function = embedding_function
+        self.conn = sqlite3.connect(cache_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_int8 "
+            "(h BLOB PRIMARY KEY, scale REAL, v BLOB)"
+        )
+
+    def embed(self, documents: list[str]) -> np.ndarray:
+        hashes = [hashlib.sha256(doc.encode("utf-8")).digest() for doc in documents]
+        vectors = [None] * len(documents)
+        misses = []
+
+        for i, h in enumerate(hashes):
+            row = self.conn.execute(
+                "SELECT scale, v FROM cache_int8 WHERE h = ?", (h,)
+            ).fetchone()
+            if row:
+                vectors[i] = _dequantize(row[0], np.frombuffer(row[1], dtype=np.int8))
+            else:
+                misses.append(i)
+
+        if misses:
+            computed = np.asarray(
+                self.embedding_function([documents[i] for i in misses]),
+                dtype=np.float32,
+            )
+            rows = []
+            for i, vec in zip(misses, computed):
+                scale, quantized = _quantize(vec)
+                rows.append((hashes[i], scale, quantized.tobytes()))
+                vectors[i] = _dequantize(scale, quantized)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO cache_int8 (h, scale, v) VALUES (?, ?, ?)",
+                rows,
+            )
+            self.conn.commit()
+
+        return np.vstack(vectors)
+
+    def close(self):
+        self.conn.close()
+
+
+class _BatchWriter:
+    """
+    Buffers documents and flushes them to a collection in fixed-size batches.
+
+    Embeddings are computed here with one model call per batch (same
+    all-MiniLM-L6-v2 model ChromaDB uses by default, so queries still match)
+    and passed in, instead of letting collection.add() embed internally.
+    """
+
+    def __init__(
+        self, collection, cache: _EmbeddingCache, batch_size: int = BATCH_SIZE
+    ):
+        self.collection = collection
+        self.cache = cache
+        self.batch_size = batch_size
+        self.documents = []
+        self.metadatas = []
+        self.ids = []
+        self.total = 0
+
+    def add(self, document: str, metadata: dict, doc_id: str):
+        self.documents.append(document)
+        self.metadatas.append(metadata)
+        self.ids.append(doc_id)
+        if len(self.documents) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.documents:
+            return
+        embeddings = self.cache.embed(self.documents)
+        self.collection.add(
+            embeddings=embeddings.tolist(),
+            documents=self.documents,
+            metadatas=self.metadatas,
+            ids=self.ids,
+        )
+        self.total += len(self.documents)
+        self.documents = []
+        self.metadatas = []
+        self.ids = []
 
 
 def build_from_existing(output_dir: str = "./output"):
     """Build vector store from existing journal and calendar files."""
 
-    journal_dir = os.path.join(output_dir, "journal")
-    calendar_file = os.path.join(output_dir, "calendar", "events.json")
-    db_path = os.path.join(output_dir, "vectordb")
+    output = Path(output_dir)
+    journal_dir = output / "journal"
+    calendar_file = output / "calendar" / "events.json"
+    db_path = output / "vectordb"
 
     # Check files exist
-    if not os.path.exists(journal_dir):
+    if not journal_dir.exists():
         print(f"ERROR: No journal files found at {journal_dir}")
         print("Run 'python main.py' first to process files.")
         sys.exit(1)
@@ -28,106 +153,109 @@ def build_from_existing(output_dir: str = "./output"):
     print(f"  Calendar file: {calendar_file}")
 
     # Create ChromaDB
-    os.makedirs(db_path, exist_ok=True)
-    client = chromadb.PersistentClient(path=db_path)
+    db_path.mkdir(parents=True, exist_ok=True)
+    client = chromadb.PersistentClient(path=str(db_path))
 
-    # Delete existing collection if exists
-    try:
+    # Delete existing collection if exists (list_collections() yields names
+    # on some ChromaDB versions and Collection objects on others)
+    existing = {getattr(c, "name", c) for c in client.list_collections()}
+    if "desktop_knowledge" in existing:
         client.delete_collection("desktop_knowledge")
-    except:
-        pass
 
     collection = client.create_collection(
         name="desktop_knowledge",
         metadata={"description": "Desktop declutter knowledge base"},
     )
 
-    documents = []
-    metadatas = []
-    ids = []
+    cache = _EmbeddingCache(
+        str(output / "embed_cache.sqlite"),
+        embedding_functions.DefaultEmbeddingFunction(),
+    )
+    writer = _BatchWriter(collection, cache)
     note_count = 0
 
+    # Identical notes/events would only add duplicate embeddings and rows
+    seen_notes = set()
+    seen_events = set()
+    duplicates = 0
+
     # Read journal files (markdown)
-    for filename in os.listdir(journal_dir):
-        if filename.endswith(".md"):
-            topic = filename.replace(".md", "")
-            filepath = os.path.join(journal_dir, filename)
-
-            with open(filepath, "r") as f:
-                content = f.read()
-
-            # Extract notes from markdown (lines starting with -)
-            lines = content.split("\n")
-            current_source = "unknown"
-
-            for line in lines:
-                if line.startswith("## From:"):
-                    current_source = line.replace("## From:", "").strip()
-                elif line.startswith("- "):
-                    note_text = line[2:].strip()
-                    if note_text:
-                        doc_id = f"note_{note_count}"
-                        documents.append(note_text)
-                        metadatas.append(
-                            {
-                                "type": "note",
-                                "topic": topic,
-                                "source_file": current_source,
-                                "tags": "",
-                            }
-                        )
-                        ids.append(doc_id)
-                        note_count += 1
+    for filepath in sorted(journal_dir.glob("*.md")):
+        topic = filepath.stem
 
-    print(f"  → Loaded {note_count} notes from journals")
+        content = filepath.read_text(encoding="utf-8")
 
-    # Read calendar events (jCal JSON)
-    event_count = 0
-    if os.path.exists(calendar_file):
-        with open(calendar_file, "r") as f:
-            jcal = json.load(f)
+        # Extract notes from markdown (lines starting with -)
+        current_source = "unknown"
 
-        # jCal structure: ["vcalendar", [props], [events]]
-        events = jcal[2] if len(jcal) > 2 else []
-
-        for event in events:
-            # event: ["vevent", [props], []]
-            if event[0] == "vevent":
-                props = {p[0]: p[3] for p in event[1]}
-
-                title = props.get("summary", "")
-                description = props.get("description", "")
-                date = props.get("dtstart", "")
-                source = props.get("x-source-file", "")
-
-                content = f"{title}. {description}".strip()
-                if content:
-                    doc_id = f"event_{event_count}"
-                    documents.append(content)
-                    metadatas.append(
+        for match in JOURNAL_LINE_PATTERN.finditer(content):
+            if match.group("src") is not None:
+                current_source = match.group("src").strip()
+            else:
+                note_text = match.group("note").strip()
+                if note_text in seen_notes:
+                    duplicates += 1
+                elif note_text:
+                    seen_notes.add(note_text)
+                    writer.add(
+                        note_text,
                         {
-                            "type": "calendar_event",
-                            "date": date,
-                            "time": "",
-                            "source_file": source,
+                            "type": "note",
+                            "topic": topic,
+                            "source_file": current_source,
                             "tags": "",
-                        }
+                        },
+                        f"note_{note_count}",
                     )
-                    ids.append(doc_id)
-                    event_count += 1
+                    note_count += 1
+
+    print(f"  → Loaded {note_count} notes from journals")
+
+    # Read calendar events (jCal JSON)
+    event_count = 0
+    if calendar_file.exists():
+        # jCal structure: ["vcalendar", [props], [events]]
+        # Stream the inner arrays one at a time; calendar props are skipped
+        # by the vevent check below
+        with open(calendar_file, "rb") as f:
+            for event in ijson.items(f, "item.item"):
+                # event: ["vevent", [props], []]
+                if event[0] == "vevent":
+                    props = extract_props(event[1])
+
+                    title = props.get("summary", "")
+                    description = props.get("description", "")
+                    date = props.get("dtstart", "")
+                    source = props.get("x-source-file", "")
+
+                    content = f"{title}. {description}".strip()
+                    if (title, date) in seen_events:
+                        duplicates += 1
+                    elif content:
+                        seen_events.add((title, date))
+                        writer.add(
+                            content,
+                            {
+                                "type": "calendar_event",
+                                "date": date,
+                                "time": "",
+                                "source_file": source,
+                                "tags": "",
+                            },
+                            f"event_{event_count}",
+                        )
+                        event_count += 1
 
     print(f"  → Loaded {event_count} calendar events")
 
-    # Add to collection
-    if documents:
-        collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids,
-        )
+    # Add any remaining partial batch
+    writer.flush()
+    cache.close()
 
     print(f"\n✅ Vector store built: {db_path}")
-    print(f"   Total documents: {len(documents)}")
+    print(f"   Total documents: {writer.total}")
+    if duplicates:
+        print(f"   Skipped duplicates: {duplicates}")
     print(f'\nTest with: python query.py "database tips"')
 
 
@@ -35,6 +35,11 @@ def main():
         action="store_true",
         help="Only rebuild vector store from existing output (no Claude API call)",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Call Claude even if the input files are unchanged, replacing the cached result and image descriptions",
+    )
 
     args = parser.parse_args()
 
@@ -68,7 +73,7 @@ def main():
 
     # Step 2: Process with Claude (ONE API call)
     print("STEP 2: Processing with Claude...")
-    processor = LLMProcessor()
+    processor = LLMProcessor(output_dir=args.output, use_cache=not args.no_cache)
     result = processor.process_all(parsed_files)
     print(f"  → Topics discovered: {result.topics}")
     print(f"  → Calendar events: {len(result.calendar_events)}")
@@ -3,10 +3,12 @@ Calendar Generator Module
 Takes Claude's processed calendar events and saves as jCal (RFC 7265) format.
 """
 
-import json
 import os
 from datetime import datetime
 
+import orjson
+
+from .jcal import extract_props
 from .llm_processor import ProcessedResult
 
 
@@ -28,8 +30,8 @@ class CalendarGenerator:
 
         # Save to file
         filepath = os.path.join(self.calendar_dir, "events.json")
-        with open(filepath, "w") as f:
-            json.dump(jcal, f, indent=2)
+        with open(filepath, "wb") as f:
+            f.write(orjson.dumps(jcal, option=orjson.OPT_INDENT_2))
 
         print(f"Created: {filepath} ({len(result.calendar_events)} events)")
         return filepath
@@ -55,15 +57,18 @@ class CalendarGenerator:
             ["calscale", {}, "text", "GREGORIAN"],
         ]
 
+        # One creation timestamp for the whole calendar
+        now = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+
         # Build event components
         components = []
         for i, event in enumerate(events):
-            vevent = self._build_vevent(event, i)
+            vevent = self._build_vevent(event, i, now)
             components.append(vevent)
 
         return ["vcalendar", cal_props, components]
 
-    def _build_vevent(self, event: dict, index: int) -> list:
+    def _build_vevent(self, event: dict, index: int, dtstamp: str) -> list:
         """Build a single vevent component in jCal format."""
 
         date_str = event.get("date", "")
@@ -97,8 +102,7 @@ class CalendarGenerator:
             props.append(["x-source-file", {}, "text", source])
 
         # Created timestamp
-        now = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
-        props.append(["dtstamp", {}, "date-time", now])
+        props.append(["dtstamp", {}, "date-time", dtstamp])
 
         return ["vevent", props, []]
 
@@ -124,14 +128,14 @@ def test_generator():
     print("=" * 60)
 
     # Show sample
-    with open(filepath) as f:
-        jcal = json.load(f)
+    with open(filepath, "rb") as f:
+        jcal = orjson.loads(f.read())
 
     events = jcal[2]  # components array
     print(f"Total events: {len(events)}")
     print("\nSample events:")
     for event in events[:3]:
-        props = {p[0]: p[3] for p in event[1]}
+        props = extract_props(event[1], ("dtstart", "summary"))
         print(f"  {props.get('dtstart', '?')}: {props.get('summary', '?')}")
 
 
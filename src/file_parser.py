@@ -7,14 +7,29 @@ Uses SmartExtractor for large/machine-generated files.
 import base64
 import csv
 import json
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
+import orjson
+
 from .smart_extractor import SmartExtractor
 
 
+def _read_text(filepath: Path) -> str:
+    """Read a UTF-8 file, hinting the kernel to prefetch it sequentially."""
+    if not hasattr(os, "posix_fadvise"):
+        return filepath.read_text(encoding="utf-8")
+
+    fd = os.open(filepath, os.O_RDONLY)
+    with os.fdopen(fd, "r", encoding="utf-8", buffering=1 << 20) as f:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        return f.read()
+
+
 @dataclass
 class ParsedFile:
     """Represents a parsed file with its content and metadata."""
@@ -24,7 +39,8 @@ class ParsedFile:
     file_type: str
     content: str
     is_code: bool = False
-    image_base64: Optional[str] = None
+    image_base64: Optional[str] = None  # raw base64 payload (no data: prefix)
+    image_media_type: Optional[str] = None
 
 
 class FileParser:
@@ -37,6 +53,13 @@ class FileParser:
     LOG_EXTENSIONS = {".log"}
     IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 
+    # Bytes read per base64 chunk (must be a multiple of 3)
+    BASE64_CHUNK_SIZE = 57 * 1024
+
+    # orjson turns integers wider than 64 bits into floats, so any file with
+    # a 19+ digit run is parsed by the stdlib json module instead
+    LONG_DIGIT_RUN = re.compile(rb"\d{19}")
+
     # Files that need smart extraction
     SMART_EXTRACT_FILES = {
         "api-test-9-25.log": "log",
@@ -51,15 +74,16 @@ class FileParser:
 
     def parse_all_files(self) -> list[ParsedFile]:
         """Parse all files in the desktop directory."""
-        parsed_files = []
-
-        for filepath in sorted(self.desktop_path.iterdir()):
-            if filepath.is_file():
-                parsed = self.parse_file(filepath)
-                if parsed:
-                    parsed_files.append(parsed)
+        # scandir's DirEntry caches the file type, saving a stat() per file
+        with os.scandir(self.desktop_path) as entries:
+            paths = sorted(Path(entry.path) for entry in entries if entry.is_file())
+        if not paths:
+            return []
 
-        return parsed_files
+        # File reads are I/O-bound and independent, so overlap them in threads.
+        # map() keeps results in the same sorted order as the input paths.
+        with ThreadPoolExecutor(max_workers=min(32, len(paths))) as executor:
+            return [parsed for parsed in executor.map(self.parse_file, paths) if parsed]
 
     def parse_file(self, filepath: Path) -> Optional[ParsedFile]:
         """Parse a single file based on its type."""
@@ -117,8 +141,7 @@ class FileParser:
 
     def _parse_text_file(self, filepath: Path) -> ParsedFile:
         """Parse markdown and text files."""
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = _read_text(filepath)
 
         return ParsedFile(
             filename=filepath.name,
@@ -130,8 +153,7 @@ class FileParser:
 
     def _parse_code_file(self, filepath: Path) -> ParsedFile:
         """Parse code files - extract full content + highlight comments."""
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = _read_text(filepath)
 
         return ParsedFile(
             filename=filepath.name,
@@ -143,20 +165,18 @@ class FileParser:
 
     def _parse_csv_file(self, filepath: Path) -> ParsedFile:
         """Parse CSV files into readable text."""
-        rows = []
         with open(filepath, "r", encoding="utf-8") as f:
             reader = csv.DictReader(f)
             headers = reader.fieldnames or []
-            for row in reader:
-                rows.append(row)
+            rows = [f"{row}\n" for row in reader]
 
         # Format as readable text
-        content = f"CSV File: {filepath.name}\n"
-        content += f"Columns: {', '.join(headers)}\n"
-        content += f"Rows: {len(rows)}\n\n"
-
-        for row in rows:
-            content += str(row) + "\n"
+        header = (
+            f"CSV File: {filepath.name}\n"
+            f"Columns: {', '.join(headers)}\n"
+            f"Rows: {len(rows)}\n\n"
+        )
+        content = header + "".join(rows)
 
         return ParsedFile(
             filename=filepath.name,
@@ -168,10 +188,18 @@ class FileParser:
 
     def _parse_json_file(self, filepath: Path) -> ParsedFile:
         """Parse JSON files."""
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        raw = filepath.read_bytes()
+        content = None
+        if not self.LONG_DIGIT_RUN.search(raw):
+            try:
+                data = orjson.loads(raw)
+                content = orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+            except orjson.JSONDecodeError:
+                pass  # e.g. NaN/Infinity, which the stdlib accepts
 
-        content = json.dumps(data, indent=2)
+        if content is None:
+            data = json.loads(raw)
+            content = json.dumps(data, indent=2, ensure_ascii=False)
 
         return ParsedFile(
             filename=filepath.name,
@@ -183,11 +211,6 @@ class FileParser:
 
     def _parse_image_file(self, filepath: Path) -> ParsedFile:
         """Parse image files by encoding to base64 for LLM analysis."""
-        with open(filepath, "rb") as f:
-            image_data = f.read()
-
-        image_base64 = base64.b64encode(image_data).decode("utf-8")
-
         # Determine media type
         ext = filepath.suffix.lower()
         media_types = {
@@ -199,13 +222,22 @@ class FileParser:
         }
         media_type = media_types.get(ext, "image/jpeg")
 
+        # Encode chunk by chunk so the raw image is never held in memory whole.
+        # Chunk size is a multiple of 3, so the encoded chunks concatenate
+        # without padding in between.
+        encoded = bytearray()
+        with open(filepath, "rb") as f:
+            while chunk := f.read(self.BASE64_CHUNK_SIZE):
+                encoded += base64.b64encode(chunk)
+
         return ParsedFile(
             filename=filepath.name,
             filepath=str(filepath),
             file_type="image",
             content=f"[Image file: {filepath.name}]",
             is_code=False,
-            image_base64=f"data:{media_type};base64,{image_base64}",
+            image_base64=encoded.decode("ascii"),
+            image_media_type=media_type,
         )
 
 
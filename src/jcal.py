@@ -0,0 +1,25 @@
+"""
+jCal Helpers
+Reads properties out of jCal (RFC 7265) events. Kept free of heavy imports
+so build_vectordb.py can use it without loading the LLM pipeline.
+"""
+
+# Event properties read back by the vector store and test output
+EVENT_PROPS = ("summary", "description", "dtstart", "x-source-file")
+
+
+def extract_props(props: list, wanted: tuple = EVENT_PROPS) -> dict:
+    """
+    Pull only the wanted property values out of a jCal property list.
+
+    Stops scanning once every wanted property has been found, so trailing
+    properties (dtstamp, rrule, ...) are skipped.
+    """
+    out = {}
+    for prop in props:
+        name = prop[0]
+        if name in wanted:
+            out[name] = prop[3]
+            if len(out) == len(wanted):
+                break
+    return out
@@ -3,11 +3,16 @@ Journal Generator Module
 Takes Claude's processed notes and saves as markdown files by topic.
 """
 
+import hashlib
 import os
+import re
 from datetime import datetime
 
 from .llm_processor import ProcessedResult
 
+# The "Generated on" line changes every run, so it is left out of comparisons
+GENERATED_LINE_PATTERN = re.compile(r"^\*Generated on .*\*$", re.M)
+
 
 class JournalGenerator:
     """Generates markdown journal files from processed notes."""
@@ -29,6 +34,7 @@ class JournalGenerator:
             by_topic.setdefault(topic, []).append(note)
 
         files_created = {}
+        created_lines = []
 
         for topic, notes in by_topic.items():
             filename = f"{topic}.md"
@@ -36,17 +42,40 @@ class JournalGenerator:
 
             content = self._generate_markdown(topic, notes)
 
-            with open(filepath, "w") as f:
-                f.write(content)
+            # Only rewrite the file if its notes actually changed
+            if self._content_hash(content) != self._file_hash(filepath):
+                with open(
+                    filepath, "w", encoding="utf-8", buffering=1 << 20, newline="\n"
+                ) as f:
+                    f.write(content)
+                status = "Created"
+            else:
+                status = "Unchanged"
 
             files_created[topic] = {
                 "path": filepath,
                 "notes_count": len(notes),
             }
-            print(f"Created: {filepath} ({len(notes)} notes)")
+            created_lines.append(f"{status}: {filepath} ({len(notes)} notes)")
+
+        if created_lines:
+            print("\n".join(created_lines))
 
         return files_created
 
+    def _content_hash(self, content: str) -> bytes:
+        """Hash markdown content, ignoring the generation timestamp."""
+        return hashlib.sha1(
+            GENERATED_LINE_PATTERN.sub("", content).encode("utf-8")
+        ).digest()
+
+    def _file_hash(self, filepath: str) -> bytes:
+        """Hash an existing journal file (empty hash if it doesn't exist)."""
+        if not os.path.exists(filepath):
+            return b""
+        with open(filepath, "r", encoding="utf-8", newline="") as f:
+            return self._content_hash(f.read())
+
     def _generate_markdown(self, topic: str, notes: list) -> str:
         """Generate markdown content for a topic."""
 
@@ -71,17 +100,18 @@ class JournalGenerator:
             lines.append(f"## From: {source}")
             lines.append("")
 
-            for note in source_notes:
-                content = note.get("content", "")
-                tags = note.get("tags", [])
-
-                lines.append(f"- {content}")
-
-                if tags:
-                    tag_str = " ".join([f"`#{t}`" for t in tags])
-                    lines.append(f"  {tag_str}")
-
-                lines.append("")
+            # One block per note: the bullet, plus an indented tag line if any
+            blocks = [
+                f"- {note.get('content', '')}"
+                + (
+                    "\n  " + " ".join(f"`#{t}`" for t in note["tags"])
+                    if note.get("tags")
+                    else ""
+                )
+                for note in source_notes
+            ]
+            lines.append("\n\n".join(blocks))
+            lines.append("")
 
         return "\n".join(lines)
 
@@ -3,11 +3,15 @@ LLM Processor Module
 Sends all parsed content to Claude and gets structured output.
 """
 
+import asyncio
+import hashlib
 import json
 import os
-from dataclasses import dataclass
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
 
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic
 
 from .file_parser import ParsedFile
 
@@ -21,9 +25,27 @@ class ProcessedResult:
     notes: list[dict]  # notes organized by topic (Claude decides topics)
 
 
+def _write_atomic(path: str, text: str):
+    """Write a file via a temp file + rename so readers never see it half-written."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
 class LLMProcessor:
     """Processes all content using Claude API."""
 
+    MODEL = "claude-sonnet-4-20250514"
+
+    IMAGE_PROMPT = "Briefly describe this image in 1-2 sentences. Is it a photo, screenshot, document, or something else?"
+
+    # Below this many images the Batches API submit/poll overhead isn't worth it
+    BATCH_MIN_IMAGES = 5
+
+    # Concurrent Vision requests when images are described individually
+    MAX_CONCURRENT_IMAGES = 8
+
     PROMPT = """You are organizing a messy desktop folder into a structured knowledge system.
 
 Below are contents from multiple files. READ EACH FILE CAREFULLY and extract ALL meaningful information.
@@ -98,50 +120,88 @@ CRITICAL RULES:
 
 """
 
-    def __init__(self, api_key: str = None):
+    def __init__(
+        self, api_key: str = None, output_dir: str = "./output", use_cache: bool = True
+    ):
         self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY required")
         self.client = Anthropic(api_key=self.api_key)
+        self.use_cache = use_cache
+        self.llm_cache_dir = os.path.join(output_dir, "llm_cache")
+        self.vision_cache_dir = os.path.join(output_dir, "vision_cache")
 
     def process_all(self, parsed_files: list[ParsedFile]) -> ProcessedResult:
         """Process all parsed files with Claude."""
 
+        # Re-running on unchanged files reuses the previous result. With
+        # use_cache off the lookup is skipped, but the fresh result still
+        # replaces the cached one.
+        cache_path = os.path.join(
+            self.llm_cache_dir, f"{self._cache_key(parsed_files)}.json"
+        )
+        if self.use_cache and os.path.exists(cache_path):
+            print(f"Using cached result: {cache_path}")
+            with open(cache_path, "r", encoding="utf-8") as f:
+                return ProcessedResult(**json.load(f))
+
         # First, process images with Claude Vision
         image_descriptions = {}
+        missing_descriptions = 0
         image_files = [pf for pf in parsed_files if pf.file_type == "image"]
 
         if image_files:
             print(f"Processing {len(image_files)} images with Claude Vision...")
+
+            # Images seen before (same bytes) don't need another API call
             for pf in image_files:
-                desc = self.process_image(pf)
-                image_descriptions[pf.filename] = desc.get(
-                    "description", "No description"
+                cached = self._cached_description(pf)
+                if cached is not None:
+                    image_descriptions[pf.filename] = cached
+            misses = [pf for pf in image_files if pf.filename not in image_descriptions]
+
+            if len(misses) >= self.BATCH_MIN_IMAGES:
+                image_descriptions.update(self._process_images_batch(misses))
+            elif misses:
+                image_descriptions.update(
+                    asyncio.run(self._process_images_concurrently(misses))
                 )
-                print(f"  → {pf.filename}: {desc.get('description', '')[:50]}...")
 
-        # Build the full prompt with all file contents
-        prompt = self.PROMPT
+            # Images without a real description get a placeholder, and the
+            # result isn't cached so they are retried on the next run
+            for pf in image_files:
+                if pf.filename not in image_descriptions:
+                    missing_descriptions += 1
+                    image_descriptions[pf.filename] = (
+                        "No description" if pf.image_base64 else "No image data"
+                    )
+                desc = image_descriptions[pf.filename]
+                print(f"  → {pf.filename}: {desc[:50]}...")
+
+        # Build the file contents part of the prompt
+        parts: list[str] = []
 
         for pf in parsed_files:
+            parts.append(f"\n--- FILE: {pf.filename} ---\n")
             if pf.file_type == "image":
                 # Include image description from Vision analysis
-                prompt += f"\n--- FILE: {pf.filename} ---\n"
-                prompt += (
-                    f"[IMAGE] {image_descriptions.get(pf.filename, 'Image file')}\n"
+                parts.append(
+                    f"[IMAGE] {image_descriptions.get(pf.filename, 'Image file')}"
                 )
             else:
-                prompt += f"\n--- FILE: {pf.filename} ---\n"
-                prompt += pf.content + "\n"
+                parts.append(pf.content)
+            parts.append("\n")
+
+        files_text = "".join(parts)
 
         print(f"Sending {len(parsed_files)} files to Claude...")
-        print(f"Total prompt size: {len(prompt):,} characters")
+        print(f"Total prompt size: {len(self.PROMPT) + len(files_text):,} characters")
 
         # Call Claude API
         response = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
+            model=self.MODEL,
             max_tokens=8000,
-            messages=[{"role": "user", "content": prompt}],
+            messages=[{"role": "user", "content": self.PROMPT + files_text}],
         )
 
         # Parse response
@@ -150,36 +210,180 @@ CRITICAL RULES:
 
         # Extract JSON from response
         try:
-            # Find JSON in response
-            json_start = response_text.find("{")
-            json_end = response_text.rfind("}") + 1
-            json_str = response_text[json_start:json_end]
-            data = json.loads(json_str)
+            # Decode exactly one JSON value starting at the first "{", ignoring
+            # any text after it (no second scan for the last "}", no slice copy)
+            json_start = max(response_text.find("{"), 0)
+            data, _ = json.JSONDecoder().raw_decode(response_text, json_start)
         except json.JSONDecodeError as e:
             print(f"Error parsing JSON: {e}")
             print(f"Response was: {response_text[:500]}...")
             raise
 
-        return ProcessedResult(
+        result = ProcessedResult(
             topics=data.get("topics", []),
             calendar_events=data.get("calendar_events", []),
             notes=data.get("notes", []),
         )
 
+        if missing_descriptions:
+            print(
+                f"Not caching result: {missing_descriptions} image(s) without a description"
+            )
+        else:
+            os.makedirs(self.llm_cache_dir, exist_ok=True)
+            _write_atomic(cache_path, json.dumps(asdict(result), indent=2))
+
+        return result
+
+    def _cache_key(self, parsed_files: list[ParsedFile]) -> str:
+        """
+        Hash everything that determines the Claude result: the prompts (the
+        image prompt shapes the descriptions fed into the main call), the
+        model, and each file's name + content (image data for images).
+        """
+        digest = hashlib.sha256()
+        digest.update(hashlib.sha256(self.PROMPT.encode("utf-8")).digest())
+        digest.update(hashlib.sha256(self.IMAGE_PROMPT.encode("utf-8")).digest())
+        digest.update(self.MODEL.encode("utf-8"))
+        for pf in sorted(parsed_files, key=lambda p: p.filename):
+            data = pf.image_base64 or pf.content
+            content_hash = hashlib.sha256(data.encode("utf-8")).hexdigest()
+            digest.update(f"{pf.filename}:{content_hash}\n".encode("utf-8"))
+        return digest.hexdigest()
+
     def process_image(self, parsed_file: ParsedFile) -> dict:
         """Process an image file with Claude Vision."""
 
         if not parsed_file.image_base64:
             return {"description": "No image data"}
 
-        # Extract base64 data
-        base64_data = parsed_file.image_base64.split(",")[1]
-        media_type = parsed_file.image_base64.split(";")[0].split(":")[1]
+        cached = self._cached_description(parsed_file)
+        if cached is not None:
+            return {"description": cached}
+
+        response = self.client.messages.create(**self._image_request(parsed_file))
+        description = response.content[0].text
+        self._store_description(parsed_file, description)
+
+        return {"description": description}
+
+    async def _process_images_concurrently(self, image_files: list[ParsedFile]) -> dict:
+        """
+        Describe a few images with concurrent Vision calls.
+
+        Used when there are too few images for the Batches API to pay off.
+        Returns {filename: description}; images without data are left out.
+        """
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_IMAGES)
+        # A fresh client per event loop: its connection pool is bound to the
+        # loop it runs on, and every process_all() call uses a new one
+        async with AsyncAnthropic(api_key=self.api_key) as client:
+            descriptions = await asyncio.gather(
+                *(
+                    self._process_image_async(client, pf, semaphore)
+                    for pf in image_files
+                )
+            )
+        return {
+            pf.filename: desc
+            for pf, desc in zip(image_files, descriptions)
+            if desc is not None
+        }
+
+    async def _process_image_async(
+        self,
+        client: AsyncAnthropic,
+        parsed_file: ParsedFile,
+        semaphore: asyncio.Semaphore,
+    ) -> Optional[str]:
+        """Async counterpart of process_image; None if there is no image data."""
 
-        response = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=500,
-            messages=[
+        if not parsed_file.image_base64:
+            return None
+
+        async with semaphore:
+            response = await client.messages.create(**self._image_request(parsed_file))
+        description = response.content[0].text
+        self._store_description(parsed_file, description)
+
+        return description
+
+    def _process_images_batch(self, image_files: list[ParsedFile]) -> dict:
+        """
+        Describe many images with one Message Batches API request.
+
+        Batched requests run in parallel on Anthropic's side and cost half
+        as much as individual calls. Returns {filename: description}; images
+        without data or whose request didn't succeed are left out.
+        """
+        descriptions = {}
+        requests = []
+        files_by_id = {}
+
+        for i, pf in enumerate(image_files):
+            if not pf.image_base64:
+                continue
+            # custom_id only allows [a-zA-Z0-9_-], so filenames can't be used
+            custom_id = f"image-{i}"
+            files_by_id[custom_id] = pf
+            requests.append({"custom_id": custom_id, "params": self._image_request(pf)})
+
+        if not requests:
+            return descriptions
+
+        batch = self.client.messages.batches.create(requests=requests)
+        print(f"  Submitted batch {batch.id} ({len(requests)} images), waiting...")
+
+        delay = 2
+        while batch.processing_status != "ended":
+            time.sleep(delay)
+            delay = min(delay * 2, 60)
+            batch = self.client.messages.batches.retrieve(batch.id)
+
+        for entry in self.client.messages.batches.results(batch.id):
+            pf = files_by_id[entry.custom_id]
+            if entry.result.type == "succeeded":
+                descriptions[pf.filename] = entry.result.message.content[0].text
+                self._store_description(pf, descriptions[pf.filename])
+
+        return descriptions
+
+    def _vision_cache_path(self, parsed_file: ParsedFile) -> str:
+        """
+        Cache file for an image's description, keyed by the model, the image
+        prompt and the encoded image bytes.
+        """
+        digest = hashlib.sha256()
+        digest.update(self.MODEL.encode("utf-8"))
+        digest.update(hashlib.sha256(self.IMAGE_PROMPT.encode("utf-8")).digest())
+        digest.update(parsed_file.image_base64.encode("ascii"))
+        return os.path.join(self.vision_cache_dir, f"{digest.hexdigest()}.txt")
+
+    def _cached_description(self, parsed_file: ParsedFile) -> Optional[str]:
+        """Return the cached Vision description for an image, or None."""
+        if not self.use_cache or not parsed_file.image_base64:
+            return None
+        cache_path = self._vision_cache_path(parsed_file)
+        if not os.path.exists(cache_path):
+            return None
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _store_description(self, parsed_file: ParsedFile, description: str):
+        """
+        Save a Vision description so the same image is never sent twice.
+        Also written with use_cache off, so a forced refresh replaces it.
+        """
+        os.makedirs(self.vision_cache_dir, exist_ok=True)
+        _write_atomic(self._vision_cache_path(parsed_file), description)
+
+    def _image_request(self, parsed_file: ParsedFile) -> dict:
+        """Build the Messages API parameters for describing one image."""
+
+        return {
+            "model": self.MODEL,
+            "max_tokens": 500,
+            "messages": [
                 {
                     "role": "user",
                     "content": [
@@ -187,20 +391,18 @@ CRITICAL RULES:
                             "type": "image",
                             "source": {
                                 "type": "base64",
-                                "media_type": media_type,
-                                "data": base64_data,
+                                "media_type": parsed_file.image_media_type,
+                                "data": parsed_file.image_base64,
                             },
                         },
                         {
                             "type": "text",
-                            "text": "Briefly describe this image in 1-2 sentences. Is it a photo, screenshot, document, or something else?",
+                            "text": self.IMAGE_PROMPT,
                         },
                     ],
                 }
             ],
-        )
-
-        return {"description": response.content[0].text}
+        }
 
 
 def test_processor():
@@ -12,10 +12,39 @@ This module handles:
 
 import csv
 import json
+import mmap
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
+try:
+    import hyperscan
+except ImportError:  # optional SIMD matcher; the re module is used without it
+    hyperscan = None
+
+# Slice size used when counting newlines in a memory-mapped file
+NEWLINE_COUNT_CHUNK = 1 << 20
+
+
+def _to_bytes_pattern(pattern: str) -> bytes:
+    """
+    Encode a text pattern for scanning undecoded UTF-8.
+
+    \\w on bytes only covers ASCII, so it is widened to also accept any
+    UTF-8 lead/continuation byte; lines that match only through that are
+    confirmed against the text pattern after decoding.
+    """
+    return pattern.replace(r"\w", r"(?:\w|[\x80-\xff])").encode()
+
+
+def _count_newlines(buffer, start: int, end: int) -> int:
+    """Count newlines in buffer[start:end] without copying it all at once."""
+    count = 0
+    for i in range(start, end, NEWLINE_COUNT_CHUNK):
+        count += buffer[i : min(i + NEWLINE_COUNT_CHUNK, end)].count(b"\n")
+    return count
+
 
 @dataclass
 class ExtractedContent:
@@ -35,11 +64,11 @@ class SmartExtractor:
 
     # Patterns that indicate human-written content in logs
     HUMAN_PATTERNS = [
-        r"#\s*(NOTE|TODO|FIXME|REMINDER|XXX)",  # Comment markers
+        r"#[ \t]*(?:NOTE|TODO|FIXME|REMINDER|XXX)",  # Comment markers
         r"need to",
         r"don\'t forget",
         r"remember to",
-        r"should (be|have|fix|check|update)",
+        r"should (?:be|have|fix|check|update)",
         r"follow up",
         r"ask \w+",
         r"check with",
@@ -47,13 +76,83 @@ class SmartExtractor:
         r"blocked by",
     ]
 
+    # Cap on serialized JSON passed through for generic dicts/arrays
+    MAX_JSON_CHARS = 50_000
+
     def __init__(self):
-        self.human_pattern = re.compile("|".join(self.HUMAN_PATTERNS), re.IGNORECASE)
+        # Bytes patterns: logs are scanned undecoded, only matches get decoded.
+        # Each alternative is its own non-capturing group, so nothing is
+        # captured and appending a pattern can't bleed into its neighbours.
+        self.human_pattern = re.compile(
+            b"|".join(b"(?:%s)" % _to_bytes_pattern(p) for p in self.HUMAN_PATTERNS),
+            re.IGNORECASE,
+        )
+        # Unicode version, to confirm candidate lines containing non-ASCII
+        self.human_text_pattern = re.compile(
+            "|".join(f"(?:{p})" for p in self.HUMAN_PATTERNS), re.IGNORECASE
+        )
+        self.level_pattern = re.compile(
+            rb"\[(?:WARN|ERROR|FATAL|CRITICAL)", re.IGNORECASE
+        )
+        # Level markers and human comments in one alternation, so a system
+        # log line is scanned once; match.lastgroup tells which one hit
+        self.combined_pattern = re.compile(
+            b"(?P<level>"
+            + self.level_pattern.pattern
+            + b")|(?P<human>"
+            + self.human_pattern.pattern
+            + b")",
+            re.IGNORECASE,
+        )
+
+        # Multi-pattern SIMD database for scanning whole log files, if available
+        self.human_db = None
+        if hyperscan is not None:
+            self.human_db = hyperscan.Database()
+            self.human_db.compile(
+                expressions=[_to_bytes_pattern(p) for p in self.HUMAN_PATTERNS],
+                ids=list(range(len(self.HUMAN_PATTERNS))),
+                elements=len(self.HUMAN_PATTERNS),
+                flags=[hyperscan.HS_FLAG_CASELESS] * len(self.HUMAN_PATTERNS),
+            )
+
+    def _human_match_offsets(self, buffer):
+        """
+        Yield ascending offsets that fall inside human-comment matches.
+
+        Uses hyperscan when installed, otherwise the compiled human_pattern
+        (which skips ahead to the next line after each hit).
+        """
+        if self.human_db is not None:
+            offsets = []
+
+            def on_match(pattern_id, start, end, flags, context):
+                offsets.append(end - 1)
+
+            # Fresh scratch per scan: extractors are shared across threads
+            self.human_db.scan(
+                buffer,
+                match_event_handler=on_match,
+                scratch=hyperscan.Scratch(self.human_db),
+            )
+            yield from sorted(offsets)
+            return
+
+        match = self.human_pattern.search(buffer)
+        while match:
+            yield match.start()
+            line_end = buffer.find(b"\n", match.start())
+            if line_end == -1:
+                return
+            match = self.human_pattern.search(buffer, line_end + 1)
 
     def extract_from_log(self, filepath: str) -> ExtractedContent:
         """
         Extract human comments from a large log file.
         Scans ALL lines but only keeps meaningful ones.
+
+        The file is memory-mapped and searched as one buffer, so only the
+        matching lines are ever sliced out, numbered, and decoded.
         """
         path = Path(filepath)
         original_size = path.stat().st_size
@@ -61,13 +160,38 @@ class SmartExtractor:
         meaningful_lines = []
         line_count = 0
 
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            for line_num, line in enumerate(f, 1):
-                line_count += 1
+        # mmap can't map an empty file
+        if original_size:
+            with open(path, "rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mm:
+                line_num = 1
+                counted_to = 0
+                next_line_start = 0
 
-                # Check if line contains human content
-                if self.human_pattern.search(line):
-                    meaningful_lines.append(f"Line {line_num}: {line.strip()}")
+                for offset in self._human_match_offsets(mm):
+                    # One entry per line: skip further hits on the same line
+                    if offset < next_line_start:
+                        continue
+
+                    line_num += _count_newlines(mm, counted_to, offset)
+                    counted_to = offset
+
+                    line_start = mm.rfind(b"\n", 0, offset) + 1
+                    line_end = mm.find(b"\n", offset)
+                    if line_end == -1:
+                        line_end = len(mm)
+
+                    next_line_start = line_end + 1
+
+                    line = mm[line_start:line_end]
+                    text = line.decode("utf-8", "ignore")
+                    if not line.isascii() and not self.human_text_pattern.search(text):
+                        continue
+                    meaningful_lines.append(f"Line {line_num}: {text.strip()}")
+
+                newlines = line_num - 1 + _count_newlines(mm, counted_to, len(mm))
+                line_count = newlines + (0 if mm[-1:] == b"\n" else 1)
 
         if meaningful_lines:
             content = f"=== Human Comments Found in {path.name} ===\n"
@@ -97,25 +221,27 @@ class SmartExtractor:
         notes = []
         row_count = 0
 
-        with open(path, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            headers = reader.fieldnames or []
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            # Plain rows + column indices: no per-row dict for 1-2 used columns
+            reader = csv.reader(f)
+            headers = next(reader, [])
 
             # Find notes-like columns
-            note_columns = [
-                h
-                for h in headers
+            note_idxs = [
+                i
+                for i, h in enumerate(headers)
                 if h.lower() in ["notes", "note", "comments", "comment", "description"]
             ]
 
             for row in reader:
+                if not row:
+                    continue
                 row_count += 1
-                for col in note_columns:
-                    value = row.get(col, "").strip()
+                for i in note_idxs:
+                    value = row[i].strip() if i < len(row) else ""
                     if value:
                         # Include some context (first column value usually)
-                        context = row.get(headers[0], "") if headers else ""
-                        notes.append(f"- [{context}] {value}")
+                        notes.append(f"- [{row[0]}] {value}")
 
         if notes:
             content = f"=== Notes from {path.name} ===\n"
@@ -144,18 +270,23 @@ class SmartExtractor:
         important_lines = []
         line_count = 0
 
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        with open(path, "rb", buffering=1 << 20) as f:
             for line_num, line in enumerate(f, 1):
                 line_count += 1
 
                 # Keep warnings, errors, and human comments
-                if any(
-                    pattern in line.upper()
-                    for pattern in ["[WARN", "[ERROR", "[FATAL", "[CRITICAL"]
+                match = self.combined_pattern.search(line)
+                if not match:
+                    continue
+
+                text = line.decode("utf-8", "ignore")
+                # A level marker later in the line still wins over a comment
+                if match.lastgroup == "level" or self.level_pattern.search(
+                    line, match.end()
                 ):
-                    important_lines.append(f"Line {line_num}: {line.strip()}")
-                elif self.human_pattern.search(line):
-                    important_lines.append(f"Line {line_num} (human): {line.strip()}")
+                    important_lines.append(f"Line {line_num}: {text.strip()}")
+                elif line.isascii() or self.human_text_pattern.search(text):
+                    important_lines.append(f"Line {line_num} (human): {text.strip()}")
 
         if important_lines:
             content = f"=== Important Items from {path.name} ===\n"
@@ -174,6 +305,14 @@ class SmartExtractor:
             items_found=len(important_lines),
         )
 
+    def _dump_capped(self, data) -> str:
+        """Pretty-print JSON, truncated to MAX_JSON_CHARS characters."""
+        dumped = json.dumps(data, indent=2)
+        if len(dumped) <= self.MAX_JSON_CHARS:
+            return dumped
+        dropped = len(dumped) - self.MAX_JSON_CHARS
+        return f"{dumped[:self.MAX_JSON_CHARS]}\n... [truncated {dropped} chars]"
+
     def extract_from_json(self, filepath: str) -> ExtractedContent:
         """
         Extract useful information from JSON file.
@@ -193,7 +332,7 @@ class SmartExtractor:
                     items_found=0,
                 )
 
-        content = f"=== Extracted from {path.name} ===\n\n"
+        parts = [f"=== Extracted from {path.name} ===\n\n"]
         items_found = 0
 
         # Handle API snapshots format
@@ -201,71 +340,77 @@ class SmartExtractor:
             # Metadata
             if "test_snapshots" in data:
                 meta = data["test_snapshots"]
-                content += "--- Metadata ---\n"
-                content += f"Description: {meta.get('description', 'N/A')}\n"
-                content += f"Environment: {meta.get('environment', 'N/A')}\n"
-                content += f"Generated: {meta.get('generated_at', 'N/A')}\n\n"
+                parts.append("--- Metadata ---\n")
+                parts.append(f"Description: {meta.get('description', 'N/A')}\n")
+                parts.append(f"Environment: {meta.get('environment', 'N/A')}\n")
+                parts.append(f"Generated: {meta.get('generated_at', 'N/A')}\n\n")
+
+            # One pass over the snapshots, filling a buffer per section
+            endpoints, roles, errors, health, perms = [], [], [], [], []
 
-            # API Endpoints
-            content += "--- API Endpoints ---\n"
             for snapshot in data["snapshots"]:
                 endpoint = snapshot.get("endpoint", "")
                 status = snapshot.get("status", "")
-                content += f"- {endpoint} [{status}]\n"
+                resp = snapshot.get("response", {})
+                endpoints.append(f"- {endpoint} [{status}]\n")
                 items_found += 1
 
-            # Roles (if present)
-            for snapshot in data["snapshots"]:
-                if snapshot.get("endpoint") == "GET /api/roles":
-                    content += "\n--- Roles Defined ---\n"
-                    roles = snapshot.get("response", {}).get("data", [])
-                    for role in roles:
-                        content += f"- {role.get('name')}: {role.get('description')} ({role.get('user_count')} users)\n"
-
-            # Error codes (if present)
-            content += "\n--- Error Codes ---\n"
-            for snapshot in data["snapshots"]:
-                resp = snapshot.get("response", {})
+                # Roles (if present)
+                if endpoint == "GET /api/roles":
+                    roles.append("\n--- Roles Defined ---\n")
+                    for role in resp.get("data", []):
+                        roles.append(
+                            f"- {role.get('name')}: {role.get('description')} ({role.get('user_count')} users)\n"
+                        )
+
+                # Error codes (if present)
                 if isinstance(resp, dict) and "error" in resp:
                     err = resp["error"]
-                    content += f"- {err.get('code')}: {err.get('message')}\n"
+                    errors.append(f"- {err.get('code')}: {err.get('message')}\n")
 
-            # Health check
-            for snapshot in data["snapshots"]:
-                if snapshot.get("endpoint") == "GET /api/health":
-                    content += "\n--- Health Check Info ---\n"
-                    resp = snapshot.get("response", {})
-                    content += f"Version: {resp.get('version')}\n"
+                # Health check
+                if endpoint == "GET /api/health":
+                    health.append("\n--- Health Check Info ---\n")
+                    health.append(f"Version: {resp.get('version')}\n")
                     checks = resp.get("checks", {})
                     for service, info in checks.items():
-                        content += f"- {service}: {info.get('status')} ({info.get('latency_ms')}ms)\n"
+                        health.append(
+                            f"- {service}: {info.get('status')} ({info.get('latency_ms')}ms)\n"
+                        )
 
-            # Permissions structure
-            for snapshot in data["snapshots"]:
-                resp = snapshot.get("response", {})
-                if isinstance(resp, dict):
+                # Permissions structure (first one only)
+                if not perms and isinstance(resp, dict):
                     user_data = resp.get("data", {})
                     if isinstance(user_data, dict) and "permissions" in user_data:
-                        content += "\n--- Permissions Structure ---\n"
-                        perms = user_data.get("permissions", [])
-                        content += f"Permissions: {', '.join(perms)}\n"
-                        break
+                        perms.append("\n--- Permissions Structure ---\n")
+                        user_perms = user_data.get("permissions", [])
+                        perms.append(f"Permissions: {', '.join(user_perms)}\n")
+
+            parts.append("--- API Endpoints ---\n")
+            parts.extend(endpoints)
+            parts.extend(roles)
+            parts.append("\n--- Error Codes ---\n")
+            parts.extend(errors)
+            parts.extend(health)
+            parts.extend(perms)
 
         # Handle generic dict
         elif isinstance(data, dict):
-            content += f"Type: Object with {len(data)} keys\n"
-            content += f"Keys: {', '.join(list(data.keys())[:10])}\n\n"
-            content += "--- Full Content ---\n"
-            content += json.dumps(data, indent=2)
+            parts.append(f"Type: Object with {len(data)} keys\n")
+            parts.append(f"Keys: {', '.join(list(data.keys())[:10])}\n\n")
+            parts.append("--- Full Content ---\n")
+            parts.append(self._dump_capped(data))
             items_found = len(data)
 
         # Handle array
         elif isinstance(data, list):
-            content += f"Type: Array with {len(data)} items\n"
-            content += "--- Full Content ---\n"
-            content += json.dumps(data, indent=2)
+            parts.append(f"Type: Array with {len(data)} items\n")
+            parts.append("--- Full Content ---\n")
+            parts.append(self._dump_capped(data))
             items_found = len(data)
 
+        content = "".join(parts)
+
         return ExtractedContent(
             filename=path.name,
             meaningful_content=content,
@@ -285,41 +430,28 @@ def test_extractor():
     print("SMART EXTRACTOR TEST")
     print("=" * 60)
 
-    # Test 1: Big log file
-    print("\n" + "-" * 60)
-    print("FILE: api-test-9-25.log")
-    print("-" * 60)
-    result = extractor.extract_from_log(desktop_path / "api-test-9-25.log")
-    print(f"Original: {result.original_size:,} bytes")
-    print(f"Extracted: {result.extracted_size:,} bytes")
-    print(f"\nContent:\n{result.meaningful_content}")
-
-    # Test 2: System logs
-    print("\n" + "-" * 60)
-    print("FILE: system_logs.txt")
-    print("-" * 60)
-    result = extractor.extract_from_system_logs(desktop_path / "system_logs.txt")
-    print(f"Original: {result.original_size:,} bytes")
-    print(f"Extracted: {result.extracted_size:,} bytes")
-    print(f"\nContent:\n{result.meaningful_content}")
-
-    # Test 3: JSON
-    print("\n" + "-" * 60)
-    print("FILE: api_responses_sample.json")
-    print("-" * 60)
-    result = extractor.extract_from_json(desktop_path / "api_responses_sample.json")
-    print(f"Original: {result.original_size:,} bytes")
-    print(f"Extracted: {result.extracted_size:,} bytes")
-    print(f"\nContent:\n{result.meaningful_content}")
-
-    # Test 4: CSV notes
-    print("\n" + "-" * 60)
-    print("FILE: dependencies_audit.csv")
-    print("-" * 60)
-    result = extractor.extract_from_csv_notes(desktop_path / "dependencies_audit.csv")
-    print(f"Original: {result.original_size:,} bytes")
-    print(f"Extracted: {result.extracted_size:,} bytes")
-    print(f"\nContent:\n{result.meaningful_content}")
+    tasks = [
+        (extractor.extract_from_log, "api-test-9-25.log"),
+        (extractor.extract_from_system_logs, "system_logs.txt"),
+        (extractor.extract_from_json, "api_responses_sample.json"),
+        (extractor.extract_from_csv_notes, "dependencies_audit.csv"),
+    ]
+
+    # The files are independent and I/O-bound, so extract them concurrently
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = [
+            executor.submit(extract, desktop_path / filename)
+            for extract, filename in tasks
+        ]
+
+        for (_, filename), future in zip(tasks, futures):
+            result = future.result()
+            print("\n" + "-" * 60)
+            print(f"FILE: {filename}")
+            print("-" * 60)
+            print(f"Original: {result.original_size:,} bytes")
+            print(f"Extracted: {result.extracted_size:,} bytes")
+            print(f"\nContent:\n{result.meaningful_content}")
 
 
 if __name__ == "__main__":
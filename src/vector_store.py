@@ -8,12 +8,18 @@ import os
 import chromadb
 from chromadb.config import Settings
 
+from .file_parser import FileParser
 from .llm_processor import ProcessedResult
 
+_IMAGE_SUFFIXES = frozenset(FileParser.IMAGE_EXTENSIONS)
+
 
 class VectorStore:
     """ChromaDB vector store for semantic search."""
 
+    # Documents per collection.add() call
+    BATCH_SIZE = 500
+
     def __init__(self, output_dir: str = "./output"):
         self.output_dir = output_dir
         self.db_path = os.path.join(output_dir, "vectordb")
@@ -23,7 +29,10 @@ class VectorStore:
         self.client = chromadb.PersistentClient(path=self.db_path)
 
         # Get or create collection
-        self.collection = self.client.get_or_create_collection(
+        self.collection = self._get_collection()
+
+    def _get_collection(self):
+        return self.client.get_or_create_collection(
             name="desktop_knowledge",
             metadata={"description": "Desktop declutter knowledge base"},
         )
@@ -34,6 +43,8 @@ class VectorStore:
         documents = []
         metadatas = []
         ids = []
+        note_count = 0
+        event_count = 0
 
         # Store notes
         for i, note in enumerate(result.notes):
@@ -43,23 +54,21 @@ class VectorStore:
             if not content.strip():
                 continue
 
+            source_file = note.get("source_file", "unknown")
+            suffix = source_file[source_file.rfind(".") :].lower()
+
             documents.append(content)
             metadatas.append(
                 {
                     "type": "note",
                     "topic": note.get("topic", "uncategorized"),
-                    "source_file": note.get("source_file", "unknown"),
+                    "source_file": source_file,
                     "tags": ",".join(note.get("tags", [])),
-                    "is_image": (
-                        "true"
-                        if note.get("source_file", "")
-                        .lower()
-                        .endswith((".jpg", ".jpeg", ".png", ".gif", ".webp"))
-                        else "false"
-                    ),
+                    "is_image": "true" if suffix in _IMAGE_SUFFIXES else "false",
                 }
             )
             ids.append(doc_id)
+            note_count += 1
 
         # Store calendar events
         for i, event in enumerate(result.calendar_events):
@@ -84,28 +93,25 @@ class VectorStore:
                 }
             )
             ids.append(doc_id)
+            event_count += 1
+
+        # Clear existing and add new: drop and recreate the collection rather
+        # than fetching every existing document just to delete it
+        self.client.delete_collection("desktop_knowledge")
+        self.collection = self._get_collection()
 
-        # Clear existing and add new
-        # First, try to delete existing items
-        try:
-            existing = self.collection.get()
-            if existing["ids"]:
-                self.collection.delete(ids=existing["ids"])
-        except Exception:
-            pass
-
-        # Add documents to collection
-        if documents:
+        # Add documents to collection in batches
+        for i in range(0, len(documents), self.BATCH_SIZE):
             self.collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids,
+                documents=documents[i : i + self.BATCH_SIZE],
+                metadatas=metadatas[i : i + self.BATCH_SIZE],
+                ids=ids[i : i + self.BATCH_SIZE],
             )
 
         stats = {
             "total_documents": len(documents),
-            "notes": len([m for m in metadatas if m["type"] == "note"]),
-            "events": len([m for m in metadatas if m["type"] == "calendar_event"]),
+            "notes": note_count,
+            "events": event_count,
             "db_path": self.db_path,
         }
 